@@ -1,54 +1,370 @@
 from enum import Enum
 
-from fastapi import FastAPI, Query, Path, Body, Cookie, Header
+from email.message import Message
 
-from typing import Annotated, Literal, Any
+import json
 
-from pydantic import BaseModel, AfterValidator, Field, HttpUrl, EmailStr
+from hashlib import sha256
+
+from functools import lru_cache
+
+from fastapi import (
+    FastAPI, APIRouter, Query, Path, Body, Cookie, Header, Request, Response,
+    HTTPException,
+)
+
+from fastapi.exceptions import RequestValidationError
+
+from fastapi.responses import ORJSONResponse
+
+from fastapi.encoders import jsonable_encoder
+
+from fastapi.openapi.models import OpenAPI
+
+from fastapi.openapi.utils import (
+    validation_error_definition, validation_error_response_definition,
+)
+
+from typing import Annotated, Literal, Any, get_origin
+
+from pydantic import (
+    BaseModel, AfterValidator, Field, HttpUrl, EmailStr, TypeAdapter,
+    ValidationError,
+)
+
+from pydantic.json_schema import GenerateJsonSchema
 
 from datetime import datetime, time, timedelta
 
 from uuid import UUID
 
+from time import perf_counter
+
+import msgspec
+
 class ModelName(str, Enum):
     alexnet = "alexnet"
     resnet = "resnet"
     lenet = "lenet"
 
-app = FastAPI()
+# ** Middleware
+# Middleware ASGI puro, a diferencia de @app.middleware("http") no crea un
+# Request y un Response extra por cada llamada, solo envuelve a send para
+# agregar el header cuando empieza la respuesta
+
+class ProcessTimeMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+
+        async def send_with_time(message):
+            if message["type"] == "http.response.start":
+                process_time = f"{perf_counter() - start:.6f}".encode()
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-process-time", process_time),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_time)
+
+# ORJSONResponse serializa con orjson (escrito en Rust) en vez del modulo json
+# de la libreria estandar, maneja UUID, datetime y set por si solo
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(ProcessTimeMiddleware)
+
+# ** Routers
+# Las rutas que comparten prefijo se agrupan en un APIRouter, se incluyen en
+# la app al final del archivo despues de declarar todas sus rutas
+items_router = APIRouter(prefix="/items")
+
+users_router = APIRouter(prefix="/users")
+
+# ** Validacion y documentacion manual
+# Los endpoints que reciben el Request crudo validan el cuerpo y los
+# parametros con estas funciones, que repiten los errores 422 de FastAPI, y se
+# documentan a mano en el esquema OpenAPI
+
+VALIDATION_ERROR_RESPONSE = {
+    "422": {
+        "description": "Validation Error",
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/HTTPValidationError"}
+            }
+        },
+    }
+}
+
+# Esquemas que usan los endpoints documentados a mano, se agregan a
+# components/schemas para que sus $ref no dependan de que otra ruta use el
+# mismo modelo
+OPENAPI_SCHEMAS = {
+    "ValidationError": validation_error_definition,
+    "HTTPValidationError": validation_error_response_definition,
+}
+
+def register_schemas(schema: dict):
+    for name, definition in schema.pop("$defs", {}).items():
+        OPENAPI_SCHEMAS.setdefault(name, definition)
+    return schema
+
+def openapi_with_registered_schemas():
+    if app.openapi_schema:
+        return app.openapi_schema
+    schema = FastAPI.openapi(app)
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    for name, definition in OPENAPI_SCHEMAS.items():
+        components.setdefault(name, definition)
+    # Se vuelve a pasar por el modelo OpenAPI como hace FastAPI, asi los
+    # esquemas agregados quedan con el mismo formato que los generados
+    app.openapi_schema = jsonable_encoder(
+        OpenAPI(**schema), by_alias=True, exclude_none=True
+    )
+    return app.openapi_schema
+
+app.openapi = openapi_with_registered_schemas
+
+def json_body_schema(adapter: TypeAdapter, title: str | None = None):
+    # Como el endpoint recibe el Request crudo, el cuerpo se documenta a mano.
+    # generate_definitions deja los modelos como $ref igual que FastAPI, asi
+    # un cuerpo Offer sigue apuntando a #/components/schemas/Offer
+    generator = GenerateJsonSchema(ref_template="#/components/schemas/{model}")
+    mapping, definitions = generator.generate_definitions(
+        inputs=[("body", "validation", adapter.core_schema)]
+    )
+    schema = mapping[("body", "validation")]
+    for name, definition in definitions.items():
+        OPENAPI_SCHEMAS.setdefault(name, definition)
+    if "$ref" not in schema:
+        schema = {**schema, "title": title}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        },
+        "responses": VALIDATION_ERROR_RESPONSE,
+    }
+
+def params_schema(model: type[BaseModel], location: str, convert_underscores=False):
+    # Igual que con el cuerpo, los parametros del modelo se documentan a mano
+    schema = register_schemas(
+        model.model_json_schema(ref_template="#/components/schemas/{model}")
+    )
+    required = schema.get("required", [])
+    return {
+        "parameters": [
+            {
+                "name": name.replace("_", "-") if convert_underscores else name,
+                "in": location,
+                "required": name in required,
+                "schema": field_schema,
+            }
+            for name, field_schema in schema["properties"].items()
+        ],
+        "responses": VALIDATION_ERROR_RESPONSE,
+    }
+
+def validation_error(e: ValidationError, location: str):
+    # Mismo formato de error 422 que usa FastAPI, con la ubicacion al inicio
+    return RequestValidationError([
+        {**error, "loc": (location, *error["loc"])}
+        for error in e.errors(include_url=False)
+    ])
+
+def is_json_request(request: Request):
+    # Misma regla que FastAPI: sin Content-Type o con application/json o
+    # application/*+json el cuerpo se lee como JSON
+    content_type = request.headers.get("content-type")
+    if not content_type:
+        return True
+    message = Message()
+    message["content-type"] = content_type
+    subtype = message.get_content_subtype()
+    return message.get_content_maintype() == "application" and (
+        subtype == "json" or subtype.endswith("+json")
+    )
 
-fake_items_db = [{"item_name": "Foo"}, {"item_name": "Bar"}, {"item_name": "Baz"}]
+async def validate_json_body(request: Request, adapter: TypeAdapter):
+    body = await request.body()
+    value = None
+    if body and is_json_request(request):
+        try:
+            return adapter.validate_json(body)
+        except ValidationError:
+            pass
+        # Si falla se repite como lo hace FastAPI (json.loads y luego validar),
+        # solo en el camino del error, para que el 422 sea el mismo
+        try:
+            value = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "json_invalid",
+                        "loc": ("body", e.pos),
+                        "msg": "JSON decode error",
+                        "input": {},
+                        "ctx": {"error": e.msg},
+                    }
+                ],
+                body=e.doc,
+            )
+        except Exception as e:
+            # Cualquier otro error al decodificar (por ejemplo bytes que no
+            # son UTF-8) es un 400, igual que en FastAPI
+            raise HTTPException(
+                status_code=400, detail="There was an error parsing the body"
+            ) from e
+    elif body:
+        # FastAPI valida los bytes tal cual y termina en un 422, asi un
+        # text/plain no se salta la revision de CORS
+        value = body
+    # Igual que en FastAPI, un cuerpo vacio o un null cuentan como faltantes
+    if value is None:
+        raise RequestValidationError([
+            {"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}
+        ])
+    try:
+        return adapter.validate_python(value, from_attributes=True)
+    except ValidationError as e:
+        raise validation_error(e, "body")
+
+def validate_params(
+    adapter: TypeAdapter,
+    model: type[BaseModel],
+    params,
+    location: str,
+    convert_underscores=False,
+):
+    # Arma el dict del modelo a partir de los query params, cookies o headers
+    # igual que FastAPI: los campos list toman todos los valores repetidos, los
+    # que faltan usan su valor por defecto y los que sobran se pasan tal cual
+    # para que "extra": "forbid" los rechace. Con convert_underscores un header
+    # que se llama igual que el campo (save_data) se ignora, solo vale save-data
+    values = {}
+    field_keys = set()
+    for name, field in model.model_fields.items():
+        key = name.replace("_", "-") if convert_underscores else name
+        field_keys.update((key, name))
+        if get_origin(field.annotation) is list and hasattr(params, "getlist"):
+            value = params.getlist(key) or None
+        else:
+            value = params.get(key)
+        if value is None and not field.is_required():
+            value = field.get_default(call_default_factory=True)
+        if value is not None:
+            values[name] = value
+    for key, value in params.items():
+        if key not in field_keys:
+            values[key] = value
+    try:
+        return adapter.validate_python(values)
+    except ValidationError as e:
+        raise validation_error(e, location)
+
+def json_response(adapter: TypeAdapter, value):
+    return Response(adapter.dump_json(value), media_type="application/json")
+
+# Tupla en vez de lista, la base falsa nunca cambia
+fake_items_db = ({"item_name": "Foo"}, {"item_name": "Bar"}, {"item_name": "Baz"})
+
+# Cada combinacion de skip y limit se recorta una sola vez, las siguientes
+# llamadas reutilizan la misma tupla
+@lru_cache(maxsize=128)
+def slice_fake_items(skip: int, limit: int):
+    return fake_items_db[skip: skip + limit]
+
+# Las respuestas que nunca cambian se serializan una sola vez al importar, el
+# endpoint solo devuelve los bytes ya listos
+
+# Cache-Control deja que el navegador y los proxies guarden la respuesta, el
+# ETag sale del contenido asi que cambia solo si cambia la respuesta
+def cache_headers(body: bytes):
+    return {
+        "Cache-Control": "public, max-age=86400",
+        "ETag": f'"{sha256(body).hexdigest()[:32]}"',
+    }
+
+def etag_matches(request: Request, etag: str):
+    # If-None-Match puede traer varios ETag separados por coma, "*" o ETags
+    # debiles (W/"..."), para GET la comparacion es debil
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+def cached_json_response(request: Request, body: bytes, headers: dict):
+    # Si el cliente ya tiene esta version responde 304 sin cuerpo
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+ROOT_BODY = ORJSONResponse({ "message": "Hello World"}).body
+
+ROOT_HEADERS = cache_headers(ROOT_BODY)
 
 @app.get("/")
-async def root():
-    return { "message": "Hello World"}
+async def root(request: Request):
+    return cached_json_response(request, ROOT_BODY, ROOT_HEADERS)
+
+# ** async def o def
+# Los endpoints de este archivo no hacen await pero terminan en menos de un
+# microsegundo, por eso se quedan como async def y corren directo en el event
+# loop. Con def FastAPI los manda al threadpool y ese salto de hilo cuesta
+# decenas de microsegundos por solicitud, def conviene solo cuando el endpoint
+# hace trabajo bloqueante (leer archivos, librerias sin soporte async, etc.)
 
 # ** PARAMETROS EN LAS RUTAS
 
 # Parametro item_id de tipo int, lo convierte si es posible
-@app.get("/items/{item_id}")
+@items_router.get("/{item_id}")
 async def read_item(item_id: int):
     return {"item_id": item_id}
 
+# Varios item_id en una sola solicitud, el cliente paga una sola vez el ruteo,
+# los headers y la serializacion en vez de una vez por cada item
+@app.post("/items:batchGet")
+async def batch_read_items(ids: Annotated[list[int], Body(embed=True)]):
+    return [{"item_id": item_id} for item_id in ids]
+
 #Misma ruta con el de abajo, pero el orden importa parao no tener errores
-@app.get("/users/me")
+@users_router.get("/me")
 async def read_user_me():
     return {"used_id": "the current user"}
 
-@app.get("/users/{user_id}")
+@users_router.get("/{user_id}")
 async def read_user(user_id: str):
     return {"user_id": user_id}
 
+# Las respuestas por modelo no cambian, se serializan una vez y se buscan por
+# el enum
+MODEL_MESSAGES = {
+    model_name: ORJSONResponse({"model_name": model_name, "message": message}).body
+    for model_name, message in (
+        (ModelName.alexnet, "Deep Learning FTW!"),
+        (ModelName.lenet, "LeCNN all the images"),
+        (ModelName.resnet, "Have some residuals"),
+    )
+}
+
+MODEL_HEADERS = {
+    model_name: cache_headers(body) for model_name, body in MODEL_MESSAGES.items()
+}
+
 #El parametro de ruta esta definido por un enum
 @app.get("/models/{model_name}")
-async def get_model(model_name: ModelName):
-    if model_name is ModelName.alexnet:
-        return {"model_name": model_name, "message": "Deep Learning FTW!"}
-    
-    if model_name is ModelName.lenet:
-        return {"model_name": model_name, "message": "LeCNN all the images"}
-    
-    return {"model_name": model_name, "message": "Have some residuals"}
+async def get_model(model_name: ModelName, request: Request):
+    return cached_json_response(
+        request, MODEL_MESSAGES[model_name], MODEL_HEADERS[model_name]
+    )
 
 #Ruta como parametro de una ruta con el tipo :path en la ruta
 @app.get("/files/{file_path:path}")
@@ -61,34 +377,33 @@ async def read_file(file_path: str):
 
 @app.get("/items2/")
 async def read_item2(skip: int = 0, limit: int = 10):
-    return fake_items_db[skip: skip + limit]
+    return slice_fake_items(skip, limit)
 
 # ** Parametros opcionales
 
+# Descripcion compartida por read_item3 y read_user_item
+LONG_DESCRIPTION = "This is an amazing item that has a long description"
+
 @app.get("/items3/{item_id}")
 async def read_item3(item_id: str, q: str | None = None, short: bool = False):
     item = {"item_id": item_id}
     if q:
-        item.update({"q": q})
+        item["q"] = q
     if not short:
-        item.update(
-            {"description": "This is an amazing item that has a long description"}
-        )
+        item["description"] = LONG_DESCRIPTION
     return item
 
 # ** Multiples parametros de ruta y query
 
-@app.get("/users/{user_id}/items/{item_id}")
+@users_router.get("/{user_id}/items/{item_id}")
 async def read_user_item(
         user_id: int, item_id: str, needy: str, q: str | None = None, short: bool = False
 ):
     item = {"item_id": item_id, "owner_id": user_id, "needy": needy}
     if q:
-        item.update({"q": q})
+        item["q"] = q
     if not short:
-        item.update(
-            {"description": "This is an amazing item that has a long description"}
-        )
+        item["description"] = LONG_DESCRIPTION
     return item
 
 class Item (BaseModel):
@@ -98,6 +413,7 @@ class Item (BaseModel):
     tax: float | None = None
 
     model_config = {
+        "frozen": True,
         "json_schema_extra": {
             "examples": [
                 {
@@ -118,7 +434,7 @@ class Item (BaseModel):
 # Si el parametro esta basado en una clase con BaseModel sera un body
 # Si el parametro es de un tipo primitivo sera un query param
 
-@app.post("/items/{item_id}")
+@items_router.post("/{item_id}")
 async def create_item(
         item_id: int, 
         item: Item, 
@@ -129,18 +445,21 @@ async def create_item(
     item_dict = item.model_dump()
     if item.tax is not None:
         price_with_tax = item.price + item.tax
-        item_dict.update({"price_with_tax": price_with_tax})
-    item_dict.update({"item_id": item_id})
+        item_dict["price_with_tax"] = price_with_tax
+    item_dict["item_id"] = item_id
     if q:
-        item_dict.update({"q": q})
+        item_dict["q"] = q
     return item_dict
 
 #Crear validadores (funciones) personalizados que seran usados despues o antes 
 # de las validaciones comunes (BeforeValidator y AfterValidator) dentro de 
 # Annotated
 
+# Los dos prefijos miden 5 caracteres, basta buscar los primeros 5 en un set
+VALID_ID_PREFIXES = frozenset({"isbn-", "imdb-"})
+
 def check_valid_id(id: str):
-    if not id.startswith(("isbn-", "imdb-")):
+    if id[:5] not in VALID_ID_PREFIXES:
         raise ValueError('Invalid ID format, it must start withc "isbn-" or "imdb-"')
     return id
 
@@ -174,10 +493,9 @@ async def read_item5(item_id: Annotated[int, Path(
                     size: Annotated[float, Query(gt=0, lt=10.5)],
                     q: Annotated[str | None, Query(alias="item-query")] = None,
     ):
-    results = {"item_id": item_id}
-    results.update({"size": size})
+    results = {"item_id": item_id, "size": size}
     if q:
-        results.update({"q": q})
+        results["q"] = q
     return results
 
 class FilterParams(BaseModel):
@@ -189,15 +507,22 @@ class FilterParams(BaseModel):
     order_by: Literal["created_at", "updated_at"] = "created_at"
     tags: list[str] = []
 
-@app.get("/items6/")
-async def read_items6(filter_query: Annotated[FilterParams, Query()]):
+FILTER_ADAPTER = TypeAdapter(FilterParams)
+
+@app.get("/items6/", openapi_extra=params_schema(FilterParams, "query"))
+async def read_items6(request: Request):
+    filter_query = validate_params(
+        FILTER_ADAPTER, FilterParams, request.query_params, "query"
+    )
     return filter_query
 
 class User(BaseModel):
+    model_config = {"frozen": True}
+
     username: str
     full_name: str | None = None
 
-@app.put("/items/{item_id}")
+@items_router.put("/{item_id}")
 async def update_item(
     item_id: Annotated[int, Path(title="The ID of the item to get", ge=0, le=1000)],
     item: Item,
@@ -207,14 +532,26 @@ async def update_item(
 ):
     results = {"item_id": item_id, "item": item, "user": user, "importance": importance}
     if q:
-        results.update({"q": q})
+        results["q"] = q
     return results
 
 class Image(BaseModel):
+    model_config = {"frozen": True}
+
     url: HttpUrl
     name: str
 
+# ** TypeAdapter
+# Un TypeAdapter creado una sola vez construye su validador y serializador al
+# importar el modulo, los endpoints lo reutilizan en cada llamada en vez de
+# dejar que FastAPI arme uno por cada tipo de cuerpo o de respuesta
+IMAGES_ADAPTER = TypeAdapter(list[Image])
+
+WEIGHTS_ADAPTER = TypeAdapter(dict[int, float])
+
 class Item2(BaseModel):
+    model_config = {"frozen": True}
+
     name: str = Field(examples=["Foo"])
     description: str | None = Field(
         default=None, title="The description of the item", max_length=300,
@@ -228,11 +565,47 @@ class Item2(BaseModel):
     images: list[Image] | None = None
 
 class Offer(BaseModel):
+    model_config = {"frozen": True}
+
     name: str
     description: str | None = None
     price: float
     items: list[Item2]
 
+OFFER_ADAPTER = TypeAdapter(Offer)
+
+HTTP_URL_ADAPTER = TypeAdapter(HttpUrl)
+
+# ** msgspec
+# Copias de Image, Item2 y Offer como msgspec.Struct, decodifican el JSON
+# directo a objetos mas livianos que los de pydantic. Los modelos de pydantic
+# siguen siendo los que documentan el endpoint y los que arman el error 422
+# gc=False deja a los Struct fuera del recolector de ciclos, nunca se
+# referencian entre si en un ciclo
+
+class ImageStruct(msgspec.Struct, gc=False):
+    url: str
+    name: str
+
+    def __post_init__(self):
+        # msgspec no tiene un tipo para URLs, se valida y normaliza igual
+        # que HttpUrl
+        self.url = str(HTTP_URL_ADAPTER.validate_python(self.url))
+
+class Item2Struct(msgspec.Struct, kw_only=True, gc=False):
+    name: str
+    description: Annotated[str, msgspec.Meta(max_length=300)] | None = None
+    price: Annotated[float, msgspec.Meta(gt=0)]
+    tax: float | None = None
+    tags: set[str] = set()
+    images: list[ImageStruct] | None = None
+
+class OfferStruct(msgspec.Struct, kw_only=True, gc=False):
+    name: str
+    description: str | None = None
+    price: float
+    items: list[Item2Struct]
+
 @app.put("/items2/{item_id}")
 async def update_item2(
     item_id: int,
@@ -241,17 +614,31 @@ async def update_item2(
     results = {"item_id": item_id, "item": item}
     return results
 
-@app.post("/offers/")
-async def create_offer(offer: Offer):
-    return offer
-
-@app.post("/images/multiple/")
-async def create_multiple_images(images: list[Image]):
-    return images
-
-@app.post("/index-weights/")
-async def create_index_weights(weights: dict[int, float]):
-    return weights
+@app.post("/offers/", openapi_extra=json_body_schema(OFFER_ADAPTER))
+async def create_offer(request: Request):
+    body = await request.body()
+    # msgspec solo lee cuerpos JSON, el resto (otro Content-Type, cuerpo vacio
+    # o datos que msgspec rechaza) se valida con pydantic, asi el error 422
+    # tiene el mismo formato que el resto de la API
+    if body and is_json_request(request):
+        try:
+            # strict=False convierte "35.4" a float igual que pydantic
+            offer = msgspec.json.decode(body, type=OfferStruct, strict=False)
+        except msgspec.MsgspecError:
+            pass
+        else:
+            return Response(msgspec.json.encode(offer), media_type="application/json")
+    return await validate_json_body(request, OFFER_ADAPTER)
+
+@app.post("/images/multiple/", openapi_extra=json_body_schema(IMAGES_ADAPTER, "Images"))
+async def create_multiple_images(request: Request):
+    images = await validate_json_body(request, IMAGES_ADAPTER)
+    return json_response(IMAGES_ADAPTER, images)
+
+@app.post("/index-weights/", openapi_extra=json_body_schema(WEIGHTS_ADAPTER, "Weights"))
+async def create_index_weights(request: Request):
+    weights = await validate_json_body(request, WEIGHTS_ADAPTER)
+    return json_response(WEIGHTS_ADAPTER, weights)
 
 @app.put("/items3/{item_id}")
 async def update_item3(
@@ -386,10 +773,11 @@ class Cookies(BaseModel):
     fatebook_tracker: str | None = None
     googall_tracker: str | None = None
 
-@app.get("/items9/")
-async def read_items9(
-    cookies: Annotated[Cookies, Cookie()]
-):
+COOKIES_ADAPTER = TypeAdapter(Cookies)
+
+@app.get("/items9/", openapi_extra=params_schema(Cookies, "cookie"))
+async def read_items9(request: Request):
+    cookies = validate_params(COOKIES_ADAPTER, Cookies, request.cookies, "cookie")
     return cookies
 
 class CommonHeaders(BaseModel):
@@ -401,31 +789,45 @@ class CommonHeaders(BaseModel):
     traceparent: str | None = None
     x_tag: list[str] = []
 
-@app.get("/items10/")
-async def read_items10(
-    headers: Annotated[CommonHeaders, Header()]
-):
+HEADERS_ADAPTER = TypeAdapter(CommonHeaders)
+
+@app.get(
+    "/items10/",
+    openapi_extra=params_schema(CommonHeaders, "header", convert_underscores=True),
+)
+async def read_items10(request: Request):
+    headers = validate_params(
+        HEADERS_ADAPTER, CommonHeaders, request.headers, "header",
+        convert_underscores=True,
+    )
     return headers
 
 class Item4(BaseModel):
+    model_config = {"frozen": True}
+
     name: str
     description: str | None = None
     price: float
     tax: float | None = None
     tags: list[str] = []
 
+# TypeAdapter creado al importar, igual que IMAGES_ADAPTER
+ITEMS_ADAPTER = TypeAdapter(list[Item4])
+
 @app.post("/items2/")
 async def create_item2(
     item: Item4
 ) -> Item4:
     return item
 
+# model_construct crea el modelo sin validarlo, solo para datos que arma el
+# propio servidor, los cuerpos que llegan del cliente siempre se validan
 @app.get("/items11/")
 async def read_items11() -> list[Item4]:
-    return [
-        Item4(name="Porta Gun", price=42.0),
-        Item4(name="Plumbus", price=32.0)
-    ]
+    return json_response(ITEMS_ADAPTER, [
+        Item4.model_construct(name="Porta Gun", price=42.0),
+        Item4.model_construct(name="Plumbus", price=32.0)
+    ])
 
 @app.post("/items3/", response_model=Item4)
 async def create_item3(
@@ -435,10 +837,11 @@ async def create_item3(
 
 @app.get("/items12/", response_model=list[Item4])
 async def read_items12() -> Any:
-    return [
+    items = ITEMS_ADAPTER.validate_python([
         {"name": "Portal Gun", "price": 42.0},
-        Item4(name="Plumbus", price=32.0)
-    ]
+        Item4.model_construct(name="Plumbus", price=32.0)
+    ])
+    return json_response(ITEMS_ADAPTER, items)
 
 class UserIn(BaseModel):
     username: str
@@ -461,4 +864,14 @@ async def create_user(
 async def create_user2(
     user: UserIn
 ) -> Any:
-    return user
\ No newline at end of file
+    return user
+
+app.include_router(items_router)
+app.include_router(users_router)
+
+# Ejecutar con `python main.py`, con `fastapi run` o `uvicorn main:app`
+# uvicorn[standard] instala uvloop y httptools y uvicorn los elige por si solo
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app)
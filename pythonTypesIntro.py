@@ -1,3 +1,5 @@
+import sys
+
 def get_full_name(first_name: str, last_name: str):
     full_name = first_name.title() + last_name.title()
     print(full_name)
@@ -7,16 +9,18 @@ def get_name_with_age(name: str, age: int):
     return name_with_age
 
 def process_items(items: list[str]):
-    for item in items:
-        print (item.capitalize)
+    if items:
+        sys.stdout.write("\n".join(map(str.capitalize, items)) + "\n")
 
 def process_items2(items_t: tuple[int, int, str], items_s: set[bytes]):
     return items_t, items_s
 
 def process_items3(prices: dict[str, float]):
-    for item_name, item_price in prices.items():
-        print(item_name)
-        print(item_price)
+    if prices:
+        sys.stdout.write(
+            "\n".join(f"{item_name}\n{item_price}" for item_name, item_price in prices.items())
+            + "\n"
+        )
 
 def process_item(item: int | str):
     print(item)
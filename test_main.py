@@ -0,0 +1,280 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+
+from main import app, OFFER_ADAPTER, ProcessTimeMiddleware
+
+client = TestClient(app)
+
+# Sin los headers por defecto de httpx (accept, user-agent, etc.), que
+# CommonHeaders rechaza por tener "extra": "forbid"
+client.headers.clear()
+
+
+def test_read_items10_header_with_underscore_is_not_the_field():
+    response = client.get("/items10/", headers={"save_data": "true"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "missing"
+    assert response.json()["detail"][0]["loc"] == ["header", "save_data"]
+
+
+def test_read_items10_ignores_header_named_like_list_field():
+    response = client.get("/items10/", headers={"save-data": "true", "x_tag": "a"})
+    assert response.status_code == 200
+    assert response.json()["x_tag"] == []
+
+
+def test_create_multiple_images_rejects_non_json_content_type():
+    response = client.post(
+        "/images/multiple/",
+        content=b'[{"url": "http://example.com", "name": "i"}]',
+        headers={"content-type": "text/plain"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "list_type"
+
+
+def test_create_multiple_images_invalid_json():
+    response = client.post(
+        "/images/multiple/",
+        content=b"{bad",
+        headers={"content-type": "application/json"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", 1]
+    assert response.json()["detail"][0]["msg"] == "JSON decode error"
+
+
+def test_create_index_weights_empty_body():
+    response = client.post("/index-weights/")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "missing"
+
+
+def test_create_offer_rejects_non_json_content_type():
+    response = client.post(
+        "/offers/",
+        content=b'{"name": "o", "price": 1, "items": []}',
+        headers={"content-type": "text/plain"},
+    )
+    assert response.status_code == 422
+
+
+def test_openapi_refs_resolve():
+    schema = client.get("/openapi.json").json()
+    components = schema["components"]["schemas"]
+
+    def refs(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key == "$ref":
+                    yield item
+                else:
+                    yield from refs(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from refs(item)
+
+    for ref in refs(schema):
+        assert ref.removeprefix("#/components/schemas/") in components
+
+
+def test_create_offer_body_references_offer_component():
+    schema = client.get("/openapi.json").json()
+    body = schema["paths"]["/offers/"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/Offer"
+    }
+    assert "Offer" in schema["components"]["schemas"]
+
+
+def test_root_returns_304_when_etag_matches():
+    etag = client.get("/").headers["etag"]
+    response = client.get("/", headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_get_model_revalidates_with_etag():
+    etag = client.get("/models/alexnet").headers["etag"]
+    response = client.get("/models/alexnet", headers={"if-none-match": f"W/{etag}"})
+    assert response.status_code == 304
+    response = client.get("/models/lenet", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.json()["model_name"] == "lenet"
+
+
+def test_create_item_q_keeps_pattern_on_string_branch():
+    schema = client.get("/openapi.json").json()
+    parameters = schema["paths"]["/items/{item_id}"]["post"]["parameters"]
+    q = next(parameter for parameter in parameters if parameter["name"] == "q")
+    assert "pattern" not in q["schema"]
+    assert q["schema"]["anyOf"][0] == {
+        "type": "string",
+        "minLength": 3,
+        "maxLength": 50,
+        "pattern": "^fixedquery$",
+    }
+
+
+def test_create_item_rejects_other_q():
+    response = client.post("/items/3?q=otherquery", json={"name": "a", "price": 1})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "string_pattern_mismatch"
+
+
+def test_json_body_that_is_not_utf8_is_a_400():
+    for path in ("/index-weights/", "/images/multiple/", "/offers/"):
+        response = client.post(
+            path, content=b"\xff", headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 400
+        assert response.json() == {"detail": "There was an error parsing the body"}
+
+
+def test_null_json_body_is_missing():
+    for path in ("/index-weights/", "/images/multiple/", "/offers/"):
+        response = client.post(
+            path, content=b"null", headers={"content-type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == [
+            {"type": "missing", "loc": ["body"], "msg": "Field required", "input": None}
+        ]
+
+
+def test_empty_body_with_other_content_type_is_missing():
+    response = client.post("/images/multiple/", headers={"content-type": "text/plain"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "missing"
+    assert response.json()["detail"][0]["loc"] == ["body"]
+
+
+def test_invalid_body_errors_start_with_body():
+    response = client.post("/index-weights/", json={"a": 1.5})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "int_parsing"
+    assert response.json()["detail"][0]["loc"] == ["body", "a", "[key]"]
+
+
+def test_read_items6_repeated_query_fills_list_field():
+    response = client.get("/items6/?tags=a&tags=b&limit=5")
+    assert response.status_code == 200
+    assert response.json() == {
+        "limit": 5, "offset": 0, "order_by": "created_at", "tags": ["a", "b"]
+    }
+
+
+def test_read_items6_rejects_extra_query():
+    response = client.get("/items6/?foo=1")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "extra_forbidden"
+    assert response.json()["detail"][0]["loc"] == ["query", "foo"]
+
+
+def test_read_items9_cookies():
+    response = client.get("/items9/")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["cookie", "session_id"]
+    assert response.json()["detail"][0]["input"] == {}
+    response = client.get("/items9/", headers={"cookie": "session_id=s; extra=x"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["cookie", "extra"]
+
+
+def test_read_items10_repeated_header_fills_list_field():
+    response = client.get(
+        "/items10/", headers=[("save-data", "true"), ("x-tag", "a"), ("x-tag", "b")]
+    )
+    assert response.status_code == 200
+    assert response.json()["x_tag"] == ["a", "b"]
+
+
+def test_batch_read_items():
+    response = client.post("/items:batchGet", json={"ids": [1, "2", 3]})
+    assert response.status_code == 200
+    assert response.json() == [{"item_id": 1}, {"item_id": 2}, {"item_id": 3}]
+
+
+def test_batch_read_items_requires_integer_ids():
+    response = client.post("/items:batchGet", json={})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "missing"
+    assert response.json()["detail"][0]["loc"] == ["body", "ids"]
+    response = client.post("/items:batchGet", json={"ids": [1, "x"]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "int_parsing"
+    assert response.json()["detail"][0]["loc"] == ["body", "ids", 1]
+
+
+def offer_body(**item):
+    return {
+        "name": "Offer",
+        "price": "35.4",
+        "items": [{"name": "Foo", "price": 3.2, **item}],
+    }
+
+
+def test_create_offer_matches_pydantic(monkeypatch):
+    # El cuerpo valido lo decodifica msgspec, sin pasar por pydantic
+    async def fail(request, adapter):
+        raise AssertionError("msgspec path not taken")
+
+    monkeypatch.setattr(main, "validate_json_body", fail)
+    body = offer_body(
+        tags=["a", "a"], images=[{"url": "http://x.com", "name": "x"}]
+    )
+    response = client.post("/offers/", json=body)
+    assert response.status_code == 200
+    offer = response.json()
+    assert offer["price"] == 35.4
+    assert offer["items"][0]["tags"] == ["a"]
+    assert offer["items"][0]["images"][0]["url"] == "http://x.com/"
+    assert offer == OFFER_ADAPTER.dump_python(
+        OFFER_ADAPTER.validate_python(body), mode="json"
+    )
+
+
+def test_create_offer_invalid_url():
+    response = client.post(
+        "/offers/", json=offer_body(images=[{"url": "nope", "name": "x"}])
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "url_parsing"
+    assert response.json()["detail"][0]["loc"] == [
+        "body", "items", 0, "images", 0, "url"
+    ]
+
+
+def test_create_offer_item_price_must_be_positive():
+    response = client.post("/offers/", json=offer_body(price=0))
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "greater_than"
+    assert response.json()["detail"][0]["loc"] == ["body", "items", 0, "price"]
+
+
+def test_process_time_header():
+    response = client.get("/items/1")
+    assert response.status_code == 200
+    assert float(response.headers["x-process-time"]) >= 0
+
+
+def test_process_time_middleware_passes_other_scopes_through():
+    # Fuera de http el middleware llama a la app con el mismo send, sin envolver
+    calls = []
+
+    async def inner(scope, receive, send):
+        calls.append((scope, receive, send))
+
+    async def receive():
+        return {"type": "lifespan.startup"}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "lifespan"}
+    asyncio.run(ProcessTimeMiddleware(inner)(scope, receive, send))
+    assert calls == [(scope, receive, send)]
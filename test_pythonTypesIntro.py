@@ -0,0 +1,28 @@
+from pythonTypesIntro import process_items, process_items3
+
+
+def test_process_items(capsys):
+    process_items(["foo", "bAR"])
+    assert capsys.readouterr().out == "Foo\nBar\n"
+
+
+def test_process_items_empty(capsys):
+    process_items([])
+    assert capsys.readouterr().out == ""
+
+
+def test_process_items3(capsys):
+    prices = {"apple": 1.5, "pear": 2.0}
+    process_items3(prices)
+    out = capsys.readouterr().out
+    assert out == "apple\n1.5\npear\n2.0\n"
+    # Mismo texto que un print por cada nombre y precio
+    for item_name, item_price in prices.items():
+        print(item_name)
+        print(item_price)
+    assert capsys.readouterr().out == out
+
+
+def test_process_items3_empty(capsys):
+    process_items3({})
+    assert capsys.readouterr().out == ""